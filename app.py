@@ -1,7 +1,10 @@
 import os
 import asyncio
-import json
+import functools
 import logging
+from collections import deque
+
+import orjson
 from typing import Dict, List, Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, File, UploadFile, Form, Request
 from fastapi.responses import HTMLResponse
@@ -16,6 +19,7 @@ from deepgram import (
     DeepgramClientOptions
 )
 
+from config import settings
 from depression_detector import DepressionDetector
 
 # Load environment variables
@@ -35,27 +39,56 @@ templates = Jinja2Templates(directory="templates")
 # Initialize the depression detector
 depression_detector = DepressionDetector()
 
+@functools.lru_cache(maxsize=4096)
+def _analyze_cached(text: str):
+    """Memoized analyze_text keyed on the normalized transcript.
+
+    Analysis is deterministic and live speech repeats short utterances
+    ("yes", "I don't know", filler), so repeats skip the NLP work entirely.
+    """
+    return depression_detector.analyze_text(text)
+
+@functools.lru_cache(maxsize=1024)
+def _depression_level_cached(score: float) -> str:
+    """Memoized get_depression_level for scores quantized to one decimal."""
+    return depression_detector.get_depression_level(score)
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Set gives O(1) removal on disconnect; WebSockets hash by identity
+        self.active_connections: set = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        # discard avoids a KeyError if the socket was already removed
+        self.active_connections.discard(websocket)
 
     async def send_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        # Snapshot tolerates concurrent connect/disconnect; gather keeps one
+        # slow client from stalling delivery to the rest
+        connections = list(self.active_connections)
+        await asyncio.gather(
+            *(connection.send_text(message) for connection in connections),
+            return_exceptions=True
+        )
 
 manager = ConnectionManager()
 
+async def send_json(payload, websocket: WebSocket) -> None:
+    """Serialize a payload with orjson and send it as one binary frame.
+
+    orjson serializes in C and emits bytes directly, so the hot transcript
+    path skips both stdlib json and the UTF-8 re-encode of send_text.
+    """
+    await websocket.send_bytes(orjson.dumps(payload))
+
 # Initialize Deepgram client
 try:
     deepgram_api_key = os.getenv("DEEPGRAM_API_KEY")
@@ -68,6 +101,34 @@ except Exception as e:
     logger.error(f"Failed to initialize Deepgram client: {e}")
     deepgram = None
 
+# Live transcription options are constant, so build them once at import time
+# rather than re-running option construction per WebSocket connection
+LIVE_OPTIONS = LiveOptions(
+    model=settings.DEEPGRAM_MODEL,
+    language=settings.DEEPGRAM_LANGUAGE,
+    encoding="linear16",
+    channels=settings.AUDIO_CHANNELS,
+    sample_rate=settings.AUDIO_SAMPLE_RATE,
+    smart_format=True,
+    interim_results=True,
+    utterance_end_ms=1000,
+    vad_events=True
+)
+
+# Cache of Deepgram clients keyed by API key so reconnecting browsers reuse
+# the client's underlying HTTP session instead of paying setup per WebSocket
+_deepgram_clients: Dict[str, DeepgramClient] = {}
+_deepgram_clients_lock = asyncio.Lock()
+
+async def get_deepgram_client(api_key: str) -> DeepgramClient:
+    """Get (or create and cache) a Deepgram client for the given API key."""
+    async with _deepgram_clients_lock:
+        client = _deepgram_clients.get(api_key)
+        if client is None:
+            client = DeepgramClient(api_key, DeepgramClientOptions(options={}))
+            _deepgram_clients[api_key] = client
+        return client
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def get_index(request: Request):
@@ -83,35 +144,30 @@ async def websocket_endpoint(websocket: WebSocket):
         user_api_key = query_params.get("api_key", "")
         
         if not user_api_key:
-            await manager.send_message(json.dumps({"error": "No Deepgram API key provided. Please provide your API key."}), websocket)
+            await send_json({"error": "No Deepgram API key provided. Please provide your API key."}, websocket)
             return
         
-        # Initialize Deepgram client with user's API key
+        # Initialize (or reuse) Deepgram client for the user's API key
         try:
-            user_deepgram = DeepgramClient(user_api_key, DeepgramClientOptions(options={}))
+            user_deepgram = await get_deepgram_client(user_api_key)
             logger.info("Deepgram client initialized with user's API key")
         except Exception as e:
             error_msg = f"Failed to initialize Deepgram client with provided API key: {e}"
             logger.error(error_msg)
-            await manager.send_message(json.dumps({"error": error_msg}), websocket)
+            await send_json({"error": error_msg}, websocket)
             return
         
-        # Set up Deepgram live transcription
-        options = LiveOptions(
-            model="nova-3",
-            language="en",
-            encoding="linear16",
-            channels=1,
-            sample_rate=16000,
-            smart_format=True,
-            interim_results=True,
-            utterance_end_ms=1000,
-            vad_events=True
-        )
-        
+        # Set up Deepgram live transcription with the precompiled options
+        options = LIVE_OPTIONS
+
         # Create live transcription connection using user's API key
         dg_connection = user_deepgram.listen.live.v("1")
-        
+
+        # Deepgram can emit the same final transcript more than once (e.g.
+        # when utterance_end_ms fires); remember the last few hashes so
+        # duplicates skip analysis, serialization and the WS send entirely
+        recent_transcript_hashes = deque(maxlen=8)
+
         # Define event handlers
         @dg_connection.on(LiveTranscriptionEvents.Transcript)
         async def handle_transcript(transcript):
@@ -123,19 +179,30 @@ async def websocket_endpoint(websocket: WebSocket):
                     spoken_text = transcript_dict["channel"]["alternatives"][0].get("transcript", "")
                     
                     if spoken_text.strip():
-                        # Process text for depression biomarkers
-                        depression_score, features = depression_detector.analyze_text(spoken_text)
-                        
+                        normalized_text = spoken_text.strip().lower()
+
+                        # Skip repeated finals for the same utterance
+                        text_hash = hash(normalized_text)
+                        if text_hash in recent_transcript_hashes:
+                            return
+                        recent_transcript_hashes.append(text_hash)
+
+                        # Process text for depression biomarkers off the event
+                        # loop so concurrent WebSocket clients are not blocked
+                        depression_score, features = await asyncio.to_thread(
+                            _analyze_cached, normalized_text
+                        )
+
                         # Create response with transcript and depression analysis
                         response = {
                             "transcript": spoken_text,
                             "depression_score": depression_score,
-                            "depression_level": depression_detector.get_depression_level(depression_score),
+                            "depression_level": _depression_level_cached(round(depression_score, 1)),
                             "features": features
                         }
                         
                         # Send results back to the client
-                        await manager.send_message(json.dumps(response), websocket)
+                        await send_json(response, websocket)
                         
                         # Log the analysis (optional)
                         logger.info(f"Depression analysis: {depression_score} - '{spoken_text[:50]}...'")
@@ -149,7 +216,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 dg_connection.send(audio_data)
             else:
                 # If the connection is not ready yet, inform the client
-                await manager.send_message(json.dumps({"error": "Deepgram connection not ready"}), websocket)
+                await send_json({"error": "Deepgram connection not ready"}, websocket)
     
     except WebSocketDisconnect:
         manager.disconnect(websocket)
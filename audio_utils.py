@@ -7,22 +7,41 @@ import os
 
 logger = logging.getLogger(__name__)
 
+def _concat_frames(frames: list) -> bytearray:
+    """Concatenate audio frames into one preallocated buffer.
+
+    Unlike b''.join, this fills a single bytearray sized up front, so the
+    result can be handed to np.frombuffer or wave.writeframes without an
+    extra full-buffer copy.
+    """
+    total = sum(len(f) for f in frames)
+    buf = bytearray(total)
+    mv = memoryview(buf)
+    offset = 0
+    for frame in frames:
+        n = len(frame)
+        mv[offset:offset + n] = frame
+        offset += n
+    return buf
+
 class AudioProcessor:
     """Utility class for audio recording and processing."""
     
-    def __init__(self, 
-                 sample_rate: int = 16000, 
-                 channels: int = 1, 
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 channels: int = 1,
                  chunk_size: int = 1024,
-                 format_type: int = pyaudio.paInt16):
+                 format_type: int = pyaudio.paInt16,
+                 max_record_seconds: int = 300):
         """
         Initialize audio processor.
-        
+
         Args:
             sample_rate: Sample rate in Hz
             channels: Number of audio channels
             chunk_size: Size of audio chunks
             format_type: Audio format type
+            max_record_seconds: Capacity of the recording ring buffer
         """
         self.sample_rate = sample_rate
         self.channels = channels
@@ -30,7 +49,50 @@ class AudioProcessor:
         self.format_type = format_type
         self.audio = None
         self.stream = None
-        
+        # Reusable conversion buffers for convert_to_pcm16 (sized on demand)
+        self._float_scratch = None
+        self._pcm_scratch = None
+        # Preallocated ring buffer written directly from the stream callback,
+        # so recording avoids the per-chunk list append + join + frombuffer
+        # copies of the frames-list approach
+        self._ring = np.empty(sample_rate * channels * max_record_seconds, dtype=np.int16)
+        self._write_idx = 0
+        self._recorded_samples = 0
+
+    def _ring_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback that writes samples into the ring buffer."""
+        chunk = np.frombuffer(in_data, dtype=np.int16)
+        capacity = self._ring.size
+        n = chunk.size
+        end = self._write_idx + n
+        if end <= capacity:
+            self._ring[self._write_idx:end] = chunk
+        else:
+            # Wrap: oldest samples get overwritten
+            split = capacity - self._write_idx
+            self._ring[self._write_idx:] = chunk[:split]
+            self._ring[:n - split] = chunk[split:]
+        self._write_idx = end % capacity
+        self._recorded_samples = min(self._recorded_samples + n, capacity)
+        return (None, pyaudio.paContinue)
+
+    def get_recorded_audio(self) -> np.ndarray:
+        """
+        Get the samples recorded so far, in chronological order.
+
+        Returns:
+            Numpy int16 array of recorded samples
+        """
+        if self._recorded_samples < self._ring.size:
+            return self._ring[:self._recorded_samples]
+        # Buffer has wrapped: stitch the two segments back into order
+        return np.concatenate((self._ring[self._write_idx:], self._ring[:self._write_idx]))
+
+    def reset_recording(self) -> None:
+        """Reset the ring buffer write position for a new recording."""
+        self._write_idx = 0
+        self._recorded_samples = 0
+
     def init_audio(self) -> bool:
         """Initialize PyAudio."""
         try:
@@ -62,7 +124,7 @@ class AudioProcessor:
                 input=True,
                 output=False,
                 frames_per_buffer=self.chunk_size,
-                stream_callback=callback
+                stream_callback=callback or self._ring_callback
             )
             return True
         except Exception as e:
@@ -90,14 +152,24 @@ class AudioProcessor:
         Returns:
             Bytes of 16-bit PCM audio
         """
+        # Reuse scratch buffers so the clip/scale/round/cast chain runs
+        # in place instead of allocating four temporaries per chunk
+        if self._float_scratch is None or self._float_scratch.shape != audio_data.shape:
+            self._float_scratch = np.empty(audio_data.shape, dtype=np.float64)
+            self._pcm_scratch = np.empty(audio_data.shape, dtype=np.int16)
+
+        scratch = self._float_scratch
+
         # Ensure the values are between -1 and 1
-        audio_data = np.clip(audio_data, -1.0, 1.0)
-        
+        np.clip(audio_data, -1.0, 1.0, out=scratch)
+
         # Convert to 16-bit PCM
-        pcm_data = (audio_data * 32767).astype(np.int16)
-        
+        np.multiply(scratch, 32767.0, out=scratch)
+        np.rint(scratch, out=scratch)
+        self._pcm_scratch[:] = scratch
+
         # Convert to bytes
-        return pcm_data.tobytes()
+        return self._pcm_scratch.tobytes()
     
     def save_audio(self, frames: list, filename: str = "recorded_audio.wav") -> str:
         """
@@ -119,7 +191,7 @@ class AudioProcessor:
             wf.setnchannels(self.channels)
             wf.setsampwidth(self.audio.get_sample_size(self.format_type))
             wf.setframerate(self.sample_rate)
-            wf.writeframes(b''.join(frames))
+            wf.writeframes(_concat_frames(frames))
             wf.close()
             logger.info(f"Audio saved to {filename}")
             return filename
@@ -142,18 +214,21 @@ class AudioProcessor:
             return {"error": "No audio frames to analyze"}
         
         try:
-            # Convert frames to numpy array
-            audio_data = np.frombuffer(b''.join(frames), dtype=np.int16).astype(np.float32) / 32768.0
-            
-            # Calculate metrics
-            rms = np.sqrt(np.mean(np.square(audio_data)))
-            peak = np.max(np.abs(audio_data))
+            # Convert frames to numpy array (np.frombuffer on the bytearray is zero-copy)
+            audio_data = np.frombuffer(_concat_frames(frames), dtype=np.int16).astype(np.float32) / 32768.0
             
+            # Calculate metrics in one pass over the squared samples
+            sq = audio_data * audio_data
+            rms = np.sqrt(sq.mean())
+            peak = np.sqrt(sq.max())
+
             # Signal-to-noise ratio approximation (simplified)
             if rms > 0:
-                # Estimate noise as the bottom 10% of samples
-                sorted_data = np.sort(np.abs(audio_data))
-                noise_level = np.mean(sorted_data[:int(len(sorted_data) * 0.1)])
+                # Estimate noise as the bottom 10% of samples; np.partition is
+                # a linear-time selection, so no need to sort the whole buffer
+                abs_data = np.abs(audio_data)
+                k = max(1, int(abs_data.size * 0.1))
+                noise_level = np.partition(abs_data, k - 1)[:k].mean()
                 snr = 20 * np.log10(rms / max(noise_level, 1e-10))
             else:
                 snr = 0
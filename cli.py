@@ -7,9 +7,10 @@ Allows analyzing audio files for depression biomarkers.
 import argparse
 import asyncio
 import json
+import mmap
 import os
 import uuid
-from typing import Dict, Any
+from typing import Any, Dict, List
 import wave
 import logging
 import sys
@@ -21,105 +22,147 @@ from logging_config import setup_logging, get_default_log_file
 
 from deepgram import (
     DeepgramClient,
-    PrerecordedOptions,
-    FileSource
+    PrerecordedOptions
 )
 
 # Set up logging
 logger = setup_logging(log_file=get_default_log_file())
 
-def analyze_audio_file(file_path: str, api_key: str = None) -> Dict[str, Any]:
+# Transcription options are constant per run; build them once at import time
+PRERECORDED_OPTIONS = PrerecordedOptions(
+    model=settings.DEEPGRAM_MODEL,
+    language=settings.DEEPGRAM_LANGUAGE,
+    smart_format=True
+)
+
+async def _process_audio(file_path: str,
+                         deepgram: DeepgramClient,
+                         detector: DepressionDetector,
+                         storage: DepressionDataStorage,
+                         session_id: str) -> Dict[str, Any]:
     """
-    Analyze an audio file for depression biomarkers.
-    
+    Transcribe and analyze one audio file with a shared Deepgram client.
+
     Args:
         file_path: Path to audio file
-        api_key: Deepgram API key (optional)
-        
+        deepgram: Shared Deepgram client
+        detector: Depression detector instance
+        storage: Data storage instance
+        session_id: Session identifier for this file
+
     Returns:
         Dictionary with analysis results
     """
-    if not os.path.exists(file_path):
-        return {"error": f"File not found: {file_path}"}
-    
+    # Transcribe audio file. mmap backs the upload with the OS page
+    # cache instead of reading the whole file into process memory,
+    # which matters for long recordings.
+    with open(file_path, "rb") as audio, \
+         mmap.mmap(audio.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        source = {"buffer": mm, "mimetype": "audio/wav"}
+        response = await deepgram.listen.prerecorded.v("1").transcribe_file(source, PRERECORDED_OPTIONS)
+        transcript_response = response.to_dict()
+
+    # Extract transcript
+    if "results" in transcript_response and "channels" in transcript_response["results"]:
+        channel = transcript_response["results"]["channels"][0]
+        if "alternatives" in channel and len(channel["alternatives"]) > 0:
+            transcript = channel["alternatives"][0].get("transcript", "")
+
+            if transcript.strip():
+                # Analyze for depression
+                depression_score, features = detector.analyze_text(transcript)
+                depression_level = detector.get_depression_level(depression_score)
+                feedback = detector.get_feedback(depression_score, features)
+
+                # Save result to database off the event loop so the
+                # synchronous sqlite3 commit does not block it
+                await asyncio.to_thread(
+                    storage.save_analysis_result,
+                    session_id,
+                    transcript,
+                    depression_score,
+                    depression_level,
+                    features
+                )
+
+                # Update session info
+                await asyncio.to_thread(storage.update_session, session_id, 0, 1)
+
+                return {
+                    "file": file_path,
+                    "transcript": transcript,
+                    "depression_score": depression_score,
+                    "depression_level": depression_level,
+                    "feedback": feedback,
+                    "features": features,
+                    "session_id": session_id
+                }
+
+    return {"file": file_path, "error": "Failed to extract transcript from audio"}
+
+async def _analyze_files(file_paths: List[str], deepgram_api_key: str) -> List[Dict[str, Any]]:
+    """Analyze several audio files concurrently against one shared client."""
+    deepgram = DeepgramClient(deepgram_api_key)
+    detector = DepressionDetector()
+    storage = DepressionDataStorage()
+    # Bound concurrency to stay within Deepgram rate limits
+    semaphore = asyncio.Semaphore(8)
+
+    async def analyze_one(file_path: str) -> Dict[str, Any]:
+        if not os.path.exists(file_path):
+            return {"file": file_path, "error": f"File not found: {file_path}"}
+
+        session_id = str(uuid.uuid4())
+        await asyncio.to_thread(storage.create_session, session_id)
+
+        try:
+            async with semaphore:
+                return await _process_audio(file_path, deepgram, detector, storage, session_id)
+        except Exception as e:
+            logger.error(f"Error analyzing audio file {file_path}: {e}")
+            return {"file": file_path, "error": f"Analysis failed: {str(e)}"}
+
+    return await asyncio.gather(*(analyze_one(p) for p in file_paths))
+
+def analyze_audio_files(file_paths: List[str], api_key: str = None) -> List[Dict[str, Any]]:
+    """
+    Analyze one or more audio files for depression biomarkers.
+
+    Files are transcribed concurrently against a single shared Deepgram
+    client, so client setup and network latency are amortized over the batch.
+
+    Args:
+        file_paths: Paths to audio files
+        api_key: Deepgram API key (optional)
+
+    Returns:
+        List of result dictionaries, one per file in input order
+    """
     # Get API key from settings or parameter
     deepgram_api_key = api_key or settings.DEEPGRAM_API_KEY
     if not deepgram_api_key:
-        return {"error": "Deepgram API key not found. Set in .env file or pass as parameter."}
-    
-    # Initialize depression detector
-    detector = DepressionDetector()
-    
-    # Initialize data storage
-    storage = DepressionDataStorage()
-    session_id = str(uuid.uuid4())
-    storage.create_session(session_id)
-    
-    try:
-        # Process file with Deepgram
-        async def process_audio():
-            # Initialize Deepgram client
-            deepgram = DeepgramClient(deepgram_api_key)
-            
-            # Set up options
-            options = PrerecordedOptions(
-                model=settings.DEEPGRAM_MODEL,
-                language=settings.DEEPGRAM_LANGUAGE,
-                smart_format=True
-            )
-            
-            # Transcribe audio file
-            with open(file_path, "rb") as audio:
-                source = FileSource(audio)
-                response = await deepgram.listen.prerecorded.v("1").transcribe_file(source, options)
-                transcript_response = response.to_dict()
-            
-            # Extract transcript
-            if "results" in transcript_response and "channels" in transcript_response["results"]:
-                channel = transcript_response["results"]["channels"][0]
-                if "alternatives" in channel and len(channel["alternatives"]) > 0:
-                    transcript = channel["alternatives"][0].get("transcript", "")
-                    
-                    if transcript.strip():
-                        # Analyze for depression
-                        depression_score, features = detector.analyze_text(transcript)
-                        depression_level = detector.get_depression_level(depression_score)
-                        feedback = detector.get_feedback(depression_score, features)
-                        
-                        # Save result to database
-                        storage.save_analysis_result(
-                            session_id, 
-                            transcript, 
-                            depression_score, 
-                            depression_level,
-                            features
-                        )
-                        
-                        # Update session info
-                        storage.update_session(session_id, 0, 1)
-                        
-                        return {
-                            "transcript": transcript,
-                            "depression_score": depression_score,
-                            "depression_level": depression_level,
-                            "feedback": feedback,
-                            "features": features,
-                            "session_id": session_id
-                        }
-            
-            return {"error": "Failed to extract transcript from audio"}
-        
-        # Run the async function
-        return asyncio.run(process_audio())
-    
-    except Exception as e:
-        logger.error(f"Error analyzing audio file: {e}")
-        return {"error": f"Analysis failed: {str(e)}"}
+        error = {"error": "Deepgram API key not found. Set in .env file or pass as parameter."}
+        return [dict(error, file=path) for path in file_paths]
+
+    return asyncio.run(_analyze_files(file_paths, deepgram_api_key))
+
+def analyze_audio_file(file_path: str, api_key: str = None) -> Dict[str, Any]:
+    """
+    Analyze an audio file for depression biomarkers.
+
+    Args:
+        file_path: Path to audio file
+        api_key: Deepgram API key (optional)
+
+    Returns:
+        Dictionary with analysis results
+    """
+    return analyze_audio_files([file_path], api_key)[0]
 
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(description="Depression Detection System - CLI")
-    parser.add_argument("--file", "-f", help="Audio file to analyze", required=True)
+    parser.add_argument("--file", "-f", nargs="+", help="Audio file(s) to analyze", required=True)
     parser.add_argument("--api-key", "-k", help="Deepgram API key (required unless set in .env file)")
     parser.add_argument("--output", "-o", help="Output file for results (JSON)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
@@ -142,31 +185,37 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    # Analyze audio file
-    print(f"Analyzing audio file: {args.file}")
-    results = analyze_audio_file(args.file, args.api_key)
-    
-    if "error" in results:
-        print(f"Error: {results['error']}")
-        sys.exit(1)
-    
-    # Display results
-    print("\n=== Depression Analysis Results ===")
-    print(f"Transcript: {results['transcript'][:100]}...")
-    print(f"Depression Score: {results['depression_score']:.1f}/100")
-    print(f"Depression Level: {results['depression_level'].upper()}")
-    print("\nDetailed Feedback:")
-    print(results['feedback'])
-    
+    # Analyze audio files concurrently
+    print(f"Analyzing {len(args.file)} audio file(s)")
+    all_results = analyze_audio_files(args.file, args.api_key)
+
+    had_error = False
+    for results in all_results:
+        if "error" in results:
+            print(f"Error ({results.get('file', 'unknown')}): {results['error']}")
+            had_error = True
+            continue
+
+        # Display results
+        print(f"\n=== Depression Analysis Results: {results['file']} ===")
+        print(f"Transcript: {results['transcript'][:100]}...")
+        print(f"Depression Score: {results['depression_score']:.1f}/100")
+        print(f"Depression Level: {results['depression_level'].upper()}")
+        print("\nDetailed Feedback:")
+        print(results['feedback'])
+
+        # Session info
+        print(f"\nSession ID: {results['session_id']}")
+        print("Use this session ID to retrieve results from the database later.")
+
     # Save results to file if requested
     if args.output:
         with open(args.output, "w") as f:
-            json.dump(results, f, indent=2)
+            json.dump(all_results[0] if len(all_results) == 1 else all_results, f, indent=2)
         print(f"\nResults saved to: {args.output}")
-    
-    # Session info
-    print(f"\nSession ID: {results['session_id']}")
-    print("Use this session ID to retrieve results from the database later.")
+
+    if had_error:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 import os
+from types import SimpleNamespace
 from typing import Dict, Any, Optional
 from pydantic import BaseSettings
 from dotenv import load_dotenv
@@ -48,9 +49,14 @@ class AppSettings(BaseSettings):
     class Config:
         env_file = ".env"
         
-def get_settings() -> AppSettings:
-    """Get application settings instance."""
-    return AppSettings()
+def get_settings() -> SimpleNamespace:
+    """Get application settings instance.
+
+    Pydantic is used only to load and validate the environment once; the
+    values are re-exported on a plain namespace so hot-path attribute reads
+    skip pydantic's descriptor machinery.
+    """
+    return SimpleNamespace(**AppSettings().dict())
 
 # Global settings instance
 settings = get_settings()
@@ -1,6 +1,10 @@
+import atexit
+import csv
 import json
 import os
 import sqlite3
+import threading
+import time
 import pandas as pd
 from datetime import datetime
 import logging
@@ -8,6 +12,62 @@ from typing import Dict, List, Any, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+def _format_timestamp(ts):
+    """Render a stored epoch timestamp as an ISO-8601 string.
+
+    Passes strings through unchanged so rows written by older versions
+    (which stored ISO text) still read back correctly.
+    """
+    if isinstance(ts, (int, float)):
+        return datetime.fromtimestamp(ts).isoformat()
+    return ts
+
+def _parse_timestamp(ts):
+    """Coerce a timestamp read from a legacy TEXT column to an epoch float.
+
+    Older schemas stored ISO strings, and the column's TEXT affinity turned
+    any epoch floats written since into strings like "1724680000.12"; both
+    come back as str. Unparseable values are returned unchanged.
+    """
+    if isinstance(ts, str):
+        try:
+            return float(ts)
+        except ValueError:
+            try:
+                return datetime.fromisoformat(ts).timestamp()
+            except ValueError:
+                return ts
+    return ts
+
+# Table schemas, shared by initial creation and the timestamp migration
+_TABLE_SCHEMAS = {
+    'analysis_sessions': '''
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT UNIQUE,
+        timestamp REAL,
+        session_duration INTEGER,
+        total_samples INTEGER
+    ''',
+    'analysis_results': '''
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT,
+        timestamp REAL,
+        transcript TEXT,
+        depression_score REAL,
+        depression_level TEXT,
+        sentiment_neg REAL,
+        sentiment_pos REAL,
+        sentiment_neu REAL,
+        depression_keyword_ratio REAL,
+        first_person_ratio REAL,
+        word_count INTEGER,
+        word_variety_ratio REAL,
+        pause_ratio REAL,
+        raw_features TEXT,
+        FOREIGN KEY (session_id) REFERENCES analysis_sessions (session_id)
+    '''
+}
+
 class DepressionDataStorage:
     """Storage class for depression analysis data."""
     
@@ -20,56 +80,128 @@ class DepressionDataStorage:
         """
         self.db_path = db_path
         self._ensure_db_dir()
+        self._lock = threading.Lock()
+        # Buffered result rows, flushed in one transaction to avoid a
+        # journal sync per utterance during live transcription.
+        self._pending: List[tuple] = []
+        self._flush_threshold = 32
         self._init_db()
-        
+        atexit.register(self.flush)
+
     def _ensure_db_dir(self):
         """Ensure the database directory exists."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
+
     def _init_db(self):
-        """Initialize the database schema."""
-        conn = self._get_connection()
+        """Initialize the database schema and the shared connection."""
+        # Single long-lived connection: per-call sqlite3.connect would pay
+        # file-open and journal setup on every small INSERT. WAL mode keeps
+        # writes cheap and lets readers run concurrently with live inserts.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn = self._conn
         cursor = conn.cursor()
-        
+
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+
         # Create tables
+        for table, body in _TABLE_SCHEMAS.items():
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({body})")
+
+        # Rebuild any table still carrying the old TEXT timestamp column
+        self._migrate_text_timestamps(cursor)
+
+        # Indexes so per-session reads are an index range scan that also
+        # satisfies ORDER BY timestamp, instead of a full scan plus sort
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analysis_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT UNIQUE,
-            timestamp TEXT,
-            session_duration INTEGER,
-            total_samples INTEGER
-        )
+        CREATE INDEX IF NOT EXISTS idx_results_session_ts
+        ON analysis_results(session_id, timestamp)
         ''')
-        
+
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analysis_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT,
-            timestamp TEXT,
-            transcript TEXT,
-            depression_score REAL,
-            depression_level TEXT,
-            sentiment_neg REAL,
-            sentiment_pos REAL,
-            sentiment_neu REAL,
-            depression_keyword_ratio REAL,
-            first_person_ratio REAL,
-            word_count INTEGER,
-            word_variety_ratio REAL,
-            pause_ratio REAL,
-            raw_features TEXT,
-            FOREIGN KEY (session_id) REFERENCES analysis_sessions (session_id)
-        )
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_sid
+        ON analysis_sessions(session_id)
         ''')
-        
+
         conn.commit()
-        conn.close()
-        
+
+        # Prepared once so SQLite can reuse its statement cache on every insert
+        self._insert_result_sql = """
+        INSERT INTO analysis_results (
+            session_id, timestamp, transcript, depression_score, depression_level,
+            sentiment_neg, sentiment_pos, sentiment_neu,
+            depression_keyword_ratio, first_person_ratio, word_count,
+            word_variety_ratio, pause_ratio, raw_features
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+
+    def _migrate_text_timestamps(self, cursor):
+        """
+        Rebuild tables whose timestamp column predates the REAL schema.
+
+        CREATE TABLE IF NOT EXISTS leaves existing databases with the old
+        TEXT-affinity timestamp column, which turns newly written epoch
+        floats into text and makes ORDER BY timestamp interleave epoch and
+        ISO strings lexicographically. Each affected table is rebuilt once
+        with the current schema and its rows backfilled as epoch floats.
+        """
+        for table, body in _TABLE_SCHEMAS.items():
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = cursor.fetchall()
+            declared = {col[1]: (col[2] or '').upper() for col in columns}
+            if declared.get('timestamp', 'REAL') == 'REAL':
+                continue
+
+            logger.info(f"Migrating {table} timestamp column to REAL")
+            names = [col[1] for col in columns]
+            ts_idx = names.index('timestamp')
+            cursor.execute(f"SELECT * FROM {table}")
+            rows = [
+                row[:ts_idx] + (_parse_timestamp(row[ts_idx]),) + row[ts_idx + 1:]
+                for row in cursor.fetchall()
+            ]
+
+            cursor.execute(f"CREATE TABLE {table}_migrated ({body})")
+            if rows:
+                placeholders = ", ".join("?" * len(names))
+                cursor.executemany(
+                    f"INSERT INTO {table}_migrated VALUES ({placeholders})", rows
+                )
+            cursor.execute(f"DROP TABLE {table}")
+            cursor.execute(f"ALTER TABLE {table}_migrated RENAME TO {table}")
+
     def _get_connection(self):
-        """Get SQLite connection."""
-        return sqlite3.connect(self.db_path)
-    
+        """Get the shared SQLite connection."""
+        return self._conn
+
+    def close(self):
+        """Flush pending results and close the shared SQLite connection."""
+        self.flush()
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def flush(self) -> bool:
+        """
+        Write any buffered analysis results to the database.
+
+        Returns:
+            Boolean indicating success
+        """
+        try:
+            with self._lock:
+                if not self._pending or not self._conn:
+                    return True
+                cursor = self._conn.cursor()
+                cursor.executemany(self._insert_result_sql, self._pending)
+                self._conn.commit()
+                self._pending.clear()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to flush analysis results: {e}")
+            return False
+
     def create_session(self, session_id: str) -> bool:
         """
         Create a new analysis session.
@@ -81,17 +213,15 @@ class DepressionDataStorage:
             Boolean indicating success
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            timestamp = datetime.now().isoformat()
-            cursor.execute(
-                "INSERT INTO analysis_sessions (session_id, timestamp, session_duration, total_samples) VALUES (?, ?, ?, ?)",
-                (session_id, timestamp, 0, 0)
-            )
-            
-            conn.commit()
-            conn.close()
+            timestamp = time.time()
+            with self._lock:
+                conn = self._get_connection()
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO analysis_sessions (session_id, timestamp, session_duration, total_samples) VALUES (?, ?, ?, ?)",
+                    (session_id, timestamp, 0, 0)
+                )
+                conn.commit()
             return True
         except Exception as e:
             logger.error(f"Failed to create session: {e}")
@@ -110,16 +240,17 @@ class DepressionDataStorage:
             Boolean indicating success
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "UPDATE analysis_sessions SET session_duration = ?, total_samples = ? WHERE session_id = ?",
-                (duration, total_samples, session_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            # Session updates mark utterance/session boundaries, so make sure
+            # buffered results hit disk alongside the session row.
+            self.flush()
+            with self._lock:
+                conn = self._get_connection()
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE analysis_sessions SET session_duration = ?, total_samples = ? WHERE session_id = ?",
+                    (duration, total_samples, session_id)
+                )
+                conn.commit()
             return True
         except Exception as e:
             logger.error(f"Failed to update session: {e}")
@@ -145,35 +276,25 @@ class DepressionDataStorage:
             Boolean indicating success
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            timestamp = datetime.now().isoformat()
+            timestamp = time.time()
             sentiment = features.get('sentiment', {})
-            
-            cursor.execute(
-                """
-                INSERT INTO analysis_results (
-                    session_id, timestamp, transcript, depression_score, depression_level,
-                    sentiment_neg, sentiment_pos, sentiment_neu,
-                    depression_keyword_ratio, first_person_ratio, word_count,
-                    word_variety_ratio, pause_ratio, raw_features
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    session_id, timestamp, transcript, depression_score, depression_level,
-                    sentiment.get('neg', 0.0), sentiment.get('pos', 0.0), sentiment.get('neu', 0.0),
-                    features.get('depression_keyword_ratio', 0.0),
-                    features.get('first_person_ratio', 0.0),
-                    features.get('word_count', 0),
-                    features.get('word_variety_ratio', 0.0),
-                    features.get('pause_ratio', 0.0),
-                    json.dumps(features)
-                )
+
+            params = (
+                session_id, timestamp, transcript, depression_score, depression_level,
+                sentiment.get('neg', 0.0), sentiment.get('pos', 0.0), sentiment.get('neu', 0.0),
+                features.get('depression_keyword_ratio', 0.0),
+                features.get('first_person_ratio', 0.0),
+                features.get('word_count', 0),
+                features.get('word_variety_ratio', 0.0),
+                features.get('pause_ratio', 0.0),
+                json.dumps(features)
             )
-            
-            conn.commit()
-            conn.close()
+
+            with self._lock:
+                self._pending.append(params)
+                flush_needed = len(self._pending) >= self._flush_threshold
+            if flush_needed:
+                return self.flush()
             return True
         except Exception as e:
             logger.error(f"Failed to save analysis result: {e}")
@@ -190,10 +311,12 @@ class DepressionDataStorage:
             DataFrame of session results
         """
         try:
+            self.flush()
             conn = self._get_connection()
             query = "SELECT * FROM analysis_results WHERE session_id = ? ORDER BY timestamp"
             df = pd.read_sql_query(query, conn, params=(session_id,))
-            conn.close()
+            if not df.empty:
+                df['timestamp'] = df['timestamp'].map(_format_timestamp)
             return df
         except Exception as e:
             logger.error(f"Failed to get session results: {e}")
@@ -209,38 +332,51 @@ class DepressionDataStorage:
         Returns:
             Dictionary with session summary
         """
-        df = self.get_session_results(session_id)
-        
-        if df.empty:
-            return {"error": "No data found for session"}
-        
         try:
-            # Get session info
+            self.flush()
             conn = self._get_connection()
             cursor = conn.cursor()
+
+            # Aggregate in SQLite instead of materializing every row in pandas
+            cursor.execute(
+                """
+                SELECT COUNT(*), AVG(depression_score), MAX(depression_score),
+                       AVG(sentiment_neg), AVG(depression_keyword_ratio),
+                       AVG(first_person_ratio)
+                FROM analysis_results WHERE session_id = ?
+                """,
+                (session_id,)
+            )
+            (result_count, avg_depression_score, max_depression_score,
+             avg_neg_sentiment, avg_keyword_ratio, avg_self_focus) = cursor.fetchone()
+
+            if not result_count:
+                return {"error": "No data found for session"}
+
+            # Get session info
             cursor.execute("SELECT * FROM analysis_sessions WHERE session_id = ?", (session_id,))
             session_data = cursor.fetchone()
-            conn.close()
-            
+
             if not session_data:
                 return {"error": "Session not found"}
-            
-            # Calculate summary statistics
-            avg_depression_score = df['depression_score'].mean()
-            max_depression_score = df['depression_score'].max()
-            score_trend = list(df['depression_score'])
-            
+
             # Count depression levels
-            level_counts = df['depression_level'].value_counts().to_dict()
-            
-            # Summarize most significant features
-            avg_neg_sentiment = df['sentiment_neg'].mean()
-            avg_keyword_ratio = df['depression_keyword_ratio'].mean()
-            avg_self_focus = df['first_person_ratio'].mean()
-            
+            cursor.execute(
+                "SELECT depression_level, COUNT(*) FROM analysis_results WHERE session_id = ? GROUP BY depression_level",
+                (session_id,)
+            )
+            level_counts = dict(cursor.fetchall())
+
+            # Score trend in chronological order
+            cursor.execute(
+                "SELECT depression_score FROM analysis_results WHERE session_id = ? ORDER BY timestamp",
+                (session_id,)
+            )
+            score_trend = [row[0] for row in cursor.fetchall()]
+
             return {
                 "session_id": session_id,
-                "timestamp": session_data[2],
+                "timestamp": _format_timestamp(session_data[2]),
                 "duration": session_data[3],
                 "total_samples": session_data[4],
                 "average_depression_score": float(avg_depression_score),
@@ -268,29 +404,48 @@ class DepressionDataStorage:
         Returns:
             Path to exported file
         """
-        df = self.get_session_results(session_id)
-        
-        if df.empty:
-            return ""
-        
         try:
+            self.flush()
+            conn = self._get_connection()
+            cursor = conn.execute(
+                "SELECT * FROM analysis_results WHERE session_id = ? ORDER BY timestamp",
+                (session_id,)
+            )
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+
+            if not rows:
+                return ""
+
+            # Stored timestamps are epoch floats; export them as ISO strings
+            ts_idx = columns.index('timestamp')
+            rows = [
+                row[:ts_idx] + (_format_timestamp(row[ts_idx]),) + row[ts_idx + 1:]
+                for row in rows
+            ]
+
             # Create export directory
             export_dir = "exports"
             os.makedirs(export_dir, exist_ok=True)
-            
+
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{export_dir}/session_{session_id}_{timestamp}"
-            
+
+            # Stream straight from the cursor rows; no DataFrame needed
             if format.lower() == "csv":
                 export_path = f"{filename}.csv"
-                df.to_csv(export_path, index=False)
+                with open(export_path, "w", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    writer.writerows(rows)
             elif format.lower() == "json":
                 export_path = f"{filename}.json"
-                df.to_json(export_path, orient="records")
+                with open(export_path, "w") as f:
+                    json.dump([dict(zip(columns, row)) for row in rows], f)
             else:
                 logger.error(f"Unsupported export format: {format}")
                 return ""
-            
+
             return export_path
         except Exception as e:
             logger.error(f"Failed to export session data: {e}")
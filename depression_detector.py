@@ -1,7 +1,7 @@
+import bisect
 import re
 import nltk
 import numpy as np
-from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.sentiment import SentimentIntensityAnalyzer
 from sklearn.feature_extraction.text import CountVectorizer
@@ -12,16 +12,69 @@ from typing import Dict, Tuple, List, Any
 # nltk.download('stopwords')
 # nltk.download('vader_lexicon')
 
+# Word and pause-marker tokenizer. The text is already lowercased, so one
+# compiled regex pass replaces nltk.word_tokenize's Penn-Treebank rule
+# cascade, which dominated analyze_text for short utterances
+_TOKEN_RE = re.compile(r"[a-z']+|\.{3}|[.,;—]")
+
+# Runs of 4+ emoticon-like characters. Some VADER releases degrade
+# catastrophically (seconds to minutes) on emoticon-heavy input, so runs are
+# clipped before sentiment scoring; normal speech transcripts are untouched
+_EMOJI_RUN_RE = re.compile(r'[^\w\s.,;:!?\'"-]{4,}')
+
+# Strips the punctuation VADER treats as intensity cues. Transcribed speech
+# carries no deliberate '!'/'?' emphasis, so skipping that scan is free
+_STRIP_TBL = str.maketrans('', '', '!?')
+
+# Depression level buckets, resolved with one bisect call per lookup
+_LEVEL_THRESHOLDS = (20.0, 40.0, 60.0, 80.0)
+_LEVEL_LABELS = ("low risk", "mild risk", "moderate risk", "high risk", "severe risk")
+
+def get_depression_levels(scores) -> np.ndarray:
+    """
+    Vectorized depression-level lookup for an array of scores.
+
+    Buckets every score with one np.searchsorted call, matching
+    DepressionDetector.get_depression_level row for row.
+
+    Args:
+        scores: Array-like of depression scores (0-100)
+
+    Returns:
+        Numpy array of level label strings
+    """
+    labels = np.array(_LEVEL_LABELS, dtype=object)
+    return labels[np.searchsorted(_LEVEL_THRESHOLDS, scores, side='right')]
+
 class DepressionDetector:
     """
     Class for detecting depression biomarkers in speech text.
     Uses linguistic, semantic, and sentiment features to assess depression risk.
     """
-    
+
+    # Shared NLTK resources: the VADER lexicon and stopword list are loaded
+    # from disk once and reused by every detector instance
+    _shared_sia = None
+    _shared_stop_words = None
+
+    @classmethod
+    def _get_sia(cls):
+        """Get the shared SentimentIntensityAnalyzer, loading it on first use."""
+        if cls._shared_sia is None:
+            cls._shared_sia = SentimentIntensityAnalyzer()
+        return cls._shared_sia
+
+    @classmethod
+    def _get_stop_words(cls):
+        """Get the shared English stopword set, loading it on first use."""
+        if cls._shared_stop_words is None:
+            cls._shared_stop_words = set(stopwords.words('english'))
+        return cls._shared_stop_words
+
     def __init__(self):
         """Initialize the DepressionDetector with required resources."""
-        self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+        self.sia = self._get_sia()
+        self.stop_words = self._get_stop_words()
         
         # Depression-related keywords
         self.depression_keywords = [
@@ -34,6 +87,37 @@ class DepressionDetector:
         
         # First-person pronouns (indicators of self-focus)
         self.first_person_pronouns = ['i', 'me', 'my', 'mine', 'myself']
+
+        # Punctuation tokens treated as pause markers
+        self.pause_markers = ['.', ',', '...', ';', '—']
+
+        # Frozenset views so the per-token membership probes in analyze_text
+        # are O(1) hash lookups instead of list scans
+        self._dep_set = frozenset(self.depression_keywords)
+        self._fp_set = frozenset(self.first_person_pronouns)
+        self._pause_set = frozenset(self.pause_markers)
+
+        # Single alternation regex over the keyword list, longest first so
+        # multi-word phrases win over their prefixes. One O(text) scan per
+        # utterance regardless of vocabulary size, and it can match phrases
+        # that per-token set probes never see
+        self._dep_re = re.compile(
+            r'\b(?:'
+            + '|'.join(map(re.escape, sorted(self.depression_keywords, key=len, reverse=True)))
+            + r')\b'
+        )
+
+        # Vocabulary-restricted vectorizer for analyze_texts: one sparse
+        # transform counts keyword and pronoun hits for a whole batch
+        vocabulary = sorted(self._dep_set | self._fp_set)
+        # Tokens split on apostrophes here so contractions contribute their
+        # leading word ("i'm" -> "i"), matching the probe in analyze_text
+        self._cv = CountVectorizer(vocabulary=vocabulary, lowercase=True,
+                                   token_pattern=r"[a-z]+")
+        vocab_index = {word: i for i, word in enumerate(vocabulary)}
+        self._dep_words = sorted(self._dep_set)
+        self._dep_cols = np.array([vocab_index[w] for w in self._dep_words])
+        self._fp_cols = np.array([vocab_index[w] for w in sorted(self._fp_set)])
         
         # Feature weights (can be adjusted based on clinical data)
         self.weights = {
@@ -44,7 +128,34 @@ class DepressionDetector:
             'word_variety': 1.0,
             'pause_frequency': 1.0
         }
+
+        # Weight vector in the feature order used by analyze_text, so the
+        # score reduces to a single dot product
+        self._w_vec = np.array([
+            self.weights['negative_sentiment'],
+            self.weights['depression_keywords'],
+            self.weights['first_person_focus'],
+            self.weights['speech_rate'],
+            self.weights['word_variety'],
+            self.weights['pause_frequency']
+        ], dtype=np.float64)
     
+    def _sentiment(self, text: str) -> Dict[str, float]:
+        """
+        Score sentiment for normalized text, guarding VADER's edge cases.
+
+        Empty and non-alphabetic inputs (the usual silence/noise transcripts
+        from ASR) short-circuit to a neutral result without running VADER's
+        rule pipeline, and emoticon runs are clipped so its worst case stays
+        bounded on adversarial input.
+        """
+        if len(text) < 3 or not any(c.isalpha() for c in text):
+            return {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0}
+        safe_text = _EMOJI_RUN_RE.sub(lambda m: m.group(0)[:3], text)[:5000]
+        # The caller already lowercased, which skips VADER's ALLCAPS scan;
+        # dropping '!'/'?' also skips its punctuation-emphasis loop
+        return self.sia.polarity_scores(safe_text.translate(_STRIP_TBL))
+
     def analyze_text(self, text: str) -> Tuple[float, Dict[str, Any]]:
         """
         Analyze speech text for depression biomarkers.
@@ -61,84 +172,195 @@ class DepressionDetector:
         text = text.lower().strip()
         
         # Tokenize
-        tokens = word_tokenize(text)
-        words = [w for w in tokens if w.isalpha()]
-        
+        tokens = _TOKEN_RE.findall(text)
+
         # Calculate features
         features = {}
-        
+
         # 1. Sentiment analysis
-        sentiment = self.sia.polarity_scores(text)
+        sentiment = self._sentiment(text)
         features['sentiment'] = sentiment
-        
-        # 2. Depression keyword frequency
-        depression_word_count = sum(1 for word in words if word in self.depression_keywords)
-        depression_keyword_ratio = depression_word_count / max(len(words), 1)
+
+        # 2-6. One fused pass over the token stream gathers the per-token
+        # counters (self-focus, pauses, lexical variety) instead of
+        # re-traversing the tokens per feature
+        word_count = 0
+        fp_count = 0
+        pause_count = 0
+        unique_words = set()
+        seen_word = unique_words.add
+        fp_set = self._fp_set
+        pause_set = self._pause_set
+        for token in tokens:
+            if token in pause_set:
+                pause_count += 1
+                continue
+            if not token[0].isalpha():
+                continue
+            word_count += 1
+            seen_word(token)
+            # Contractions tokenize as single tokens ("i'm", "i've"); probe
+            # the pronoun set with the part before the apostrophe so they
+            # still register as first-person hits
+            if token.partition("'")[0] in fp_set:
+                fp_count += 1
+
+        # 2. Depression keyword frequency: one alternation scan of the text,
+        # which also catches multi-word keyword phrases
+        keywords_found = self._dep_re.findall(text)
+        depression_keyword_ratio = len(keywords_found) / max(word_count, 1)
         features['depression_keyword_ratio'] = depression_keyword_ratio
-        features['depression_keywords_found'] = [word for word in words if word in self.depression_keywords]
-        
+        features['depression_keywords_found'] = keywords_found
+
         # 3. First-person pronoun usage (self-focus)
-        fp_count = sum(1 for word in words if word in self.first_person_pronouns)
-        fp_ratio = fp_count / max(len(words), 1)
+        fp_ratio = fp_count / max(word_count, 1)
         features['first_person_ratio'] = fp_ratio
-        
+
         # 4. Speech characteristics
         # Word count and speech rate (proxy)
-        features['word_count'] = len(words)
-        
+        features['word_count'] = word_count
+
         # 5. Word variety (lexical diversity)
-        unique_words = len(set(words))
-        word_variety_ratio = unique_words / max(len(words), 1)
+        word_variety_ratio = len(unique_words) / max(word_count, 1)
         features['word_variety_ratio'] = word_variety_ratio
-        
+
         # 6. Approximate pause frequency using punctuation as proxy
-        pause_markers = ['.', ',', '...', ';', '—']
-        pause_count = sum(1 for token in tokens if token in pause_markers)
         pause_ratio = pause_count / max(len(tokens), 1)
         features['pause_ratio'] = pause_ratio
         
-        # Calculate depression score (0-100)
-        score = 0
-        score += self.weights['negative_sentiment'] * (sentiment['neg'] * 100)
-        score += self.weights['depression_keywords'] * (depression_keyword_ratio * 100)
-        score += self.weights['first_person_focus'] * (fp_ratio * 50)  # Less weight for self-focus
-        
         # Lower speech rate may indicate depression
-        speech_rate_factor = max(0, 1 - (len(words) / 150)) if len(text) > 50 else 0
-        score += self.weights['speech_rate'] * (speech_rate_factor * 50)
-        
+        speech_rate_factor = max(0, 1 - (word_count / 150)) if len(text) > 50 else 0
+
         # Lower word variety may indicate depression
         word_variety_factor = max(0, 1 - word_variety_ratio)
-        score += self.weights['word_variety'] * (word_variety_factor * 50)
-        
-        # Higher pause frequency may indicate depression
-        score += self.weights['pause_frequency'] * (pause_ratio * 50)
-        
+
+        # Calculate depression score (0-100) as one weighted dot product
+        feature_vec = np.array([
+            sentiment['neg'] * 100,
+            depression_keyword_ratio * 100,
+            fp_ratio * 50,  # Less weight for self-focus
+            speech_rate_factor * 50,
+            word_variety_factor * 50,
+            pause_ratio * 50  # Higher pause frequency may indicate depression
+        ], dtype=np.float64)
+        score = float(np.dot(self._w_vec, feature_vec))
+
+
         # Normalize score to 0-100 range
         normalized_score = min(100, max(0, score))
         
         return normalized_score, features
     
-    def get_depression_level(self, score: float) -> str:
+    def analyze_texts(self, texts: List[str]) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Analyze a batch of speech texts for depression biomarkers.
+
+        Keyword and pronoun counts come from a single sparse CountVectorizer
+        transform over the whole batch, and the final scores from one matrix
+        product against the weight vector, amortizing the per-call Python
+        overhead of analyze_text across many utterances.
+
+        Args:
+            texts: List of transcribed speech texts
+
+        Returns:
+            List of (depression score, features dictionary) tuples,
+            one per input text in order
+        """
+        if not texts:
+            return []
+
+        normalized = [text.lower().strip() for text in texts]
+        n = len(normalized)
+
+        # Keyword/pronoun counts for the whole batch in one sparse transform.
+        # The keyword columns are materialized once and reused for both the
+        # per-text counts and the found-keyword lists
+        counts = self._cv.transform(normalized)
+        dep_hits = counts[:, self._dep_cols].toarray()
+        dep_counts = dep_hits.sum(axis=1)
+        fp_counts = np.asarray(counts[:, self._fp_cols].sum(axis=1)).ravel()
+
+        # Per-text stats that depend on the token stream itself
+        sentiments = []
+        word_counts = np.empty(n)
+        variety_ratios = np.empty(n)
+        pause_ratios = np.empty(n)
+        text_lengths = np.empty(n)
+        for i, text in enumerate(normalized):
+            sentiments.append(self._sentiment(text))
+
+            tokens = _TOKEN_RE.findall(text)
+            word_count = 0
+            pause_count = 0
+            unique_words = set()
+            seen_word = unique_words.add
+            for token in tokens:
+                if token in self._pause_set:
+                    pause_count += 1
+                elif token[0].isalpha():
+                    word_count += 1
+                    seen_word(token)
+            word_counts[i] = word_count
+            variety_ratios[i] = len(unique_words) / max(word_count, 1)
+            pause_ratios[i] = pause_count / max(len(tokens), 1)
+            text_lengths[i] = len(text)
+
+        # Vectorized feature ratios and scoring (same formula as analyze_text)
+        denom = np.maximum(word_counts, 1)
+        dep_ratios = dep_counts / denom
+        fp_ratios = fp_counts / denom
+        neg_sentiments = np.array([s['neg'] for s in sentiments])
+        speech_rate_factors = np.where(
+            text_lengths > 50, np.maximum(0, 1 - word_counts / 150), 0
+        )
+        variety_factors = np.maximum(0, 1 - variety_ratios)
+
+        feature_matrix = np.column_stack([
+            neg_sentiments * 100,
+            dep_ratios * 100,
+            fp_ratios * 50,
+            speech_rate_factors * 50,
+            variety_factors * 50,
+            pause_ratios * 50
+        ])
+        scores = np.clip(feature_matrix @ self._w_vec, 0, 100)
+
+        results = []
+        for i in range(n):
+            keywords_found = [
+                word
+                for word, count in zip(self._dep_words, dep_hits[i])
+                for _ in range(int(count))
+            ]
+            features = {
+                'sentiment': sentiments[i],
+                'depression_keyword_ratio': float(dep_ratios[i]),
+                'depression_keywords_found': keywords_found,
+                'first_person_ratio': float(fp_ratios[i]),
+                'word_count': int(word_counts[i]),
+                'word_variety_ratio': float(variety_ratios[i]),
+                'pause_ratio': float(pause_ratios[i])
+            }
+            results.append((float(scores[i]), features))
+
+        return results
+
+    @staticmethod
+    def get_depression_level(score: float) -> str:
         """
         Convert numerical depression score to a descriptive level.
-        
+
+        A pure table lookup: one bisect over the module-level thresholds,
+        with no per-call instance state involved.
+
         Args:
             score: Depression score (0-100)
-            
+
         Returns:
             String description of depression level
         """
-        if score < 20:
-            return "low risk"
-        elif score < 40:
-            return "mild risk"
-        elif score < 60:
-            return "moderate risk"
-        elif score < 80:
-            return "high risk"
-        else:
-            return "severe risk"
+        return _LEVEL_LABELS[bisect.bisect_right(_LEVEL_THRESHOLDS, score)]
     
     def get_feedback(self, score: float, features: Dict[str, Any]) -> str:
         """
@@ -152,38 +374,40 @@ class DepressionDetector:
             String feedback with observations and recommendations
         """
         level = self.get_depression_level(score)
-        
-        feedback = f"Depression risk level: {level.upper()} ({score:.1f}/100)\n\n"
-        
+
+        # Collect segments in a list and join once, rather than growing an
+        # immutable string with repeated concatenation
+        parts = [f"Depression risk level: {level.upper()} ({score:.1f}/100)\n\n"]
+
         # Add observations
-        feedback += "Observations:\n"
-        
+        parts.append("Observations:\n")
+
         # Sentiment
         sentiment = features['sentiment']
         if sentiment['neg'] > 0.3:
-            feedback += "- High negative emotional content detected in speech\n"
-        
+            parts.append("- High negative emotional content detected in speech\n")
+
         # Depression keywords
         if features['depression_keywords_found']:
-            feedback += f"- Depression-related keywords detected: {', '.join(features['depression_keywords_found'][:5])}\n"
+            parts.append(f"- Depression-related keywords detected: {', '.join(features['depression_keywords_found'][:5])}\n")
             if len(features['depression_keywords_found']) > 5:
-                feedback += f"  (and {len(features['depression_keywords_found']) - 5} more)\n"
-        
+                parts.append(f"  (and {len(features['depression_keywords_found']) - 5} more)\n")
+
         # First-person focus
         if features['first_person_ratio'] > 0.15:
-            feedback += "- High self-focus in speech patterns\n"
-        
+            parts.append("- High self-focus in speech patterns\n")
+
         # Recommendations based on risk level
-        feedback += "\nRecommendations:\n"
+        parts.append("\nRecommendations:\n")
         if score >= 60:
-            feedback += "- Consider consulting a mental health professional\n"
-            feedback += "- This tool is not diagnostic but suggests potential concern\n"
+            parts.append("- Consider consulting a mental health professional\n")
+            parts.append("- This tool is not diagnostic but suggests potential concern\n")
         elif score >= 40:
-            feedback += "- Consider monitoring mood patterns\n"
-            feedback += "- Practice self-care activities\n"
+            parts.append("- Consider monitoring mood patterns\n")
+            parts.append("- Practice self-care activities\n")
         else:
-            feedback += "- Continue monitoring for any significant changes\n"
-        
-        feedback += "\nNote: This is an automated analysis and not a clinical diagnosis."
-        
-        return feedback
+            parts.append("- Continue monitoring for any significant changes\n")
+
+        parts.append("\nNote: This is an automated analysis and not a clinical diagnosis.")
+
+        return "".join(parts)
@@ -1,43 +1,68 @@
+import atexit
 import logging
 import sys
 import os
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
 
 def setup_logging(log_level=logging.INFO, log_file=None):
     """
     Configure logging for the application.
-    
+
+    Log records are routed through a queue to a background listener thread,
+    so console and file writes never block the thread that emitted them.
+
     Args:
         log_level: Logging level (default: INFO)
         log_file: Optional log file path
     """
-    # Create logs directory if it doesn't exist
-    if log_file and not os.path.exists(os.path.dirname(log_file)):
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
+    # Create logs directory if it doesn't exist (exist_ok already covers
+    # the existence check, so no separate stat is needed)
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    
-    # Remove existing handlers
+
+    # Remove existing handlers, stopping any previous queue listener
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-    
+    previous_listener = getattr(root_logger, '_queue_listener', None)
+    if previous_listener:
+        # Drop the atexit hook first: QueueListener.stop() is not
+        # idempotent, and a second call at interpreter exit would raise
+        atexit.unregister(previous_listener.stop)
+        previous_listener.stop()
+
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     console_handler.setFormatter(console_format)
-    root_logger.addHandler(console_handler)
-    
+    handlers = [console_handler]
+
     # Create file handler if log file is specified
     if log_file:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(log_level)
         file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(file_format)
-        root_logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    # Emitting threads only enqueue records; the listener thread does the
+    # actual console/file I/O
+    log_queue = Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # Keep a reference so the listener is not garbage collected and can be
+    # stopped if logging is reconfigured
+    root_logger._queue_listener = listener
+
     return root_logger
 
 def get_logger(name, log_level=logging.INFO):
@@ -8,7 +8,6 @@ import argparse
 import os
 import sys
 import logging
-import uvicorn
 from logging_config import setup_logging, get_default_log_file
 from config import settings
 
@@ -44,6 +43,10 @@ def main():
     
     # Handle commands
     if args.command == "server":
+        # Import here so the analyze command doesn't pay the uvicorn/FastAPI
+        # import cost at startup
+        import uvicorn
+
         # Run web server
         logger.info(f"Starting web server on {args.host}:{args.port}")
         print(f"Starting depression detection web server at http://{args.host}:{args.port}")
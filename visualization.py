@@ -3,7 +3,6 @@ Visualization utilities for the Depression Detection system.
 Provides functions for generating charts and visualizations of depression analysis results.
 """
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import json
@@ -13,9 +12,39 @@ import logging
 from datetime import datetime
 
 from data_storage import DepressionDataStorage
+from depression_detector import get_depression_levels
 
 logger = logging.getLogger(__name__)
 
+# matplotlib is imported lazily so importing this module (e.g. for report
+# helpers) doesn't pay its load cost until a chart is actually drawn
+plt = None
+
+def _ensure_plt():
+    """Import matplotlib on first use, forcing the headless Agg backend."""
+    global plt
+    if plt is None:
+        import matplotlib
+        # Select Agg before pyplot is imported, so chart generation never
+        # initializes a GUI toolkit on the server
+        matplotlib.use('Agg')
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return plt
+
+# One reusable figure shared by the chart functions; clearing it per chart
+# avoids constructing and tearing down a Figure and canvas on every call
+_FIG = None
+
+def _get_figure(width: float, height: float):
+    """Get the shared figure, cleared and resized for the next chart."""
+    global _FIG
+    if _FIG is None:
+        _FIG = _ensure_plt().figure()
+    _FIG.clf()
+    _FIG.set_size_inches(width, height)
+    return _FIG
+
 def create_depression_score_chart(scores: List[float], timestamps: Optional[List[str]] = None, 
                                  title: str = "Depression Score Trend", 
                                  output_path: Optional[str] = None) -> str:
@@ -32,8 +61,9 @@ def create_depression_score_chart(scores: List[float], timestamps: Optional[List
         Path to saved chart image
     """
     try:
-        plt.figure(figsize=(10, 6))
-        
+        fig = _get_figure(10, 6)
+        ax = fig.add_subplot(111)
+
         # Create x-axis (either timestamps or sequential numbers)
         x = range(len(scores))
         if timestamps:
@@ -44,38 +74,37 @@ def create_depression_score_chart(scores: List[float], timestamps: Optional[List
                 except ValueError:
                     # If conversion fails, use sequential numbers
                     x = range(len(scores))
-        
+
         # Plot the scores
-        plt.plot(x, scores, marker='o', linestyle='-', color='#2c7fb8', linewidth=2, markersize=6)
-        
+        ax.plot(x, scores, marker='o', linestyle='-', color='#2c7fb8', linewidth=2, markersize=6)
+
         # Add colored background regions for different depression levels
-        plt.axhspan(0, 20, alpha=0.2, color='green', label='Low Risk')
-        plt.axhspan(20, 40, alpha=0.2, color='yellow', label='Mild Risk')
-        plt.axhspan(40, 60, alpha=0.2, color='orange', label='Moderate Risk')
-        plt.axhspan(60, 80, alpha=0.2, color='red', label='High Risk')
-        plt.axhspan(80, 100, alpha=0.2, color='purple', label='Severe Risk')
-        
+        ax.axhspan(0, 20, alpha=0.2, color='green', label='Low Risk')
+        ax.axhspan(20, 40, alpha=0.2, color='yellow', label='Mild Risk')
+        ax.axhspan(40, 60, alpha=0.2, color='orange', label='Moderate Risk')
+        ax.axhspan(60, 80, alpha=0.2, color='red', label='High Risk')
+        ax.axhspan(80, 100, alpha=0.2, color='purple', label='Severe Risk')
+
         # Configure the chart
-        plt.ylim(0, 100)
-        plt.title(title, fontsize=14, fontweight='bold')
-        plt.ylabel('Depression Score', fontsize=12)
-        
+        ax.set_ylim(0, 100)
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_ylabel('Depression Score', fontsize=12)
+
         if isinstance(x[0], datetime):
-            plt.xlabel('Time', fontsize=12)
-            plt.gcf().autofmt_xdate()
+            ax.set_xlabel('Time', fontsize=12)
+            fig.autofmt_xdate()
         else:
-            plt.xlabel('Sample', fontsize=12)
-        
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.legend(loc='upper right')
-        
+            ax.set_xlabel('Sample', fontsize=12)
+
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend(loc='upper right')
+
         # Save the chart if output path is provided
         if output_path:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=300)
-            plt.close()
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=150)
             return output_path
         else:
             # Create a temporary file
@@ -83,11 +112,10 @@ def create_depression_score_chart(scores: List[float], timestamps: Optional[List
             temp_dir = "temp_charts"
             os.makedirs(temp_dir, exist_ok=True)
             temp_path = f"{temp_dir}/depression_score_chart_{timestamp}.png"
-            plt.tight_layout()
-            plt.savefig(temp_path, dpi=300)
-            plt.close()
+            fig.tight_layout()
+            fig.savefig(temp_path, dpi=150)
             return temp_path
-    
+
     except Exception as e:
         logger.error(f"Failed to create depression score chart: {e}")
         return ""
@@ -113,7 +141,7 @@ def create_feature_radar_chart(features: Dict[str, float],
             return ""
         
         # Create figure
-        fig = plt.figure(figsize=(8, 8))
+        fig = _get_figure(8, 8)
         ax = fig.add_subplot(111, polar=True)
         
         # Extract labels and values, ensuring values are in 0-1 range
@@ -141,15 +169,14 @@ def create_feature_radar_chart(features: Dict[str, float],
         # Configure chart
         ax.set_ylim(0, 1)
         ax.grid(True)
-        plt.title(title, fontsize=14, fontweight='bold', y=1.1)
-        
+        ax.set_title(title, fontsize=14, fontweight='bold', y=1.1)
+
         # Save the chart if output path is provided
         if output_path:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=300)
-            plt.close()
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=150)
             return output_path
         else:
             # Create a temporary file
@@ -157,15 +184,48 @@ def create_feature_radar_chart(features: Dict[str, float],
             temp_dir = "temp_charts"
             os.makedirs(temp_dir, exist_ok=True)
             temp_path = f"{temp_dir}/feature_radar_chart_{timestamp}.png"
-            plt.tight_layout()
-            plt.savefig(temp_path, dpi=300)
-            plt.close()
+            fig.tight_layout()
+            fig.savefig(temp_path, dpi=150)
             return temp_path
     
     except Exception as e:
         logger.error(f"Failed to create feature radar chart: {e}")
         return ""
 
+# Static report fragments, built once instead of re-assembled per report
+_REPORT_STYLE = """    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }
+        h1, h2, h3 { color: #333; }
+        .container { max-width: 900px; margin: 0 auto; }
+        .section { margin-bottom: 30px; }
+        .score-chart { text-align: center; margin: 20px 0; }
+        .score-chart img { max-width: 100%; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; }
+        th { background-color: #f2f2f2; }
+        tr:nth-child(even) { background-color: #f9f9f9; }
+        .summary-box { background-color: #f5f5f5; padding: 15px; border-radius: 5px; }
+        .risk-low { color: green; }
+        .risk-mild { color: #ffc107; }
+        .risk-moderate { color: orange; }
+        .risk-high { color: red; }
+        .risk-severe { color: purple; }
+    </style>"""
+
+_REPORT_FOOTER = """
+        </div>
+
+        <div class="section">
+            <h3>Disclaimer</h3>
+            <p>This analysis is for informational purposes only and is not a clinical diagnosis.
+            Always consult with qualified healthcare professionals for mental health concerns.</p>
+            <p><small>Report generated on {generated}</small></p>
+        </div>
+    </div>
+</body>
+</html>
+            """
+
 def generate_session_report(session_id: str, output_path: Optional[str] = None) -> str:
     """
     Generate a comprehensive PDF report for a session.
@@ -212,30 +272,26 @@ def generate_session_report(session_id: str, output_path: Optional[str] = None)
         if not output_path:
             output_path = f"{report_dir}/session_report_{session_id[:8]}_{timestamp}.html"
         
-        # Create simple HTML report
-        with open(output_path, 'w') as f:
-            f.write(f"""<!DOCTYPE html>
+        # Materialize the sampled columns once; per-row .iloc lookups inside
+        # the sample loop are far slower than plain array indexing
+        ts_arr = session_data['timestamp'].to_numpy()
+        tx_arr = session_data['transcript'].to_numpy()
+        sc_arr = session_data['depression_score'].to_numpy()
+        # Bucket every row's level in one vectorized lookup rather than
+        # trusting per-row stored labels that may predate threshold changes
+        lv_arr = get_depression_levels(sc_arr)
+
+        # Chart path relative to the report, computed once up front
+        chart_src = os.path.relpath(score_chart, os.path.dirname(output_path))
+
+        # Build the whole report in memory and write it in one call; the
+        # static style block comes from the module-level constant
+        parts = []
+        parts.append(f"""<!DOCTYPE html>
 <html>
 <head>
     <title>Depression Analysis Report - Session {session_id[:8]}</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-        h1, h2, h3 {{ color: #333; }}
-        .container {{ max-width: 900px; margin: 0 auto; }}
-        .section {{ margin-bottom: 30px; }}
-        .score-chart {{ text-align: center; margin: 20px 0; }}
-        .score-chart img {{ max-width: 100%; }}
-        table {{ border-collapse: collapse; width: 100%; }}
-        th, td {{ border: 1px solid #ddd; padding: 8px; }}
-        th {{ background-color: #f2f2f2; }}
-        tr:nth-child(even) {{ background-color: #f9f9f9; }}
-        .summary-box {{ background-color: #f5f5f5; padding: 15px; border-radius: 5px; }}
-        .risk-low {{ color: green; }}
-        .risk-mild {{ color: #ffc107; }}
-        .risk-moderate {{ color: orange; }}
-        .risk-high {{ color: red; }}
-        .risk-severe {{ color: purple; }}
-    </style>
+{_REPORT_STYLE}
 </head>
 <body>
     <div class="container">
@@ -248,11 +304,11 @@ def generate_session_report(session_id: str, output_path: Optional[str] = None)
             <p><strong>Average Depression Score:</strong> {summary.get('average_depression_score', 0):.1f}/100</p>
             <p><strong>Maximum Depression Score:</strong> {summary.get('max_depression_score', 0):.1f}/100</p>
         </div>
-        
+
         <div class="section">
             <h2>Depression Score Trend</h2>
             <div class="score-chart">
-                <img src="{os.path.relpath(score_chart, os.path.dirname(output_path))}" alt="Depression Score Trend">
+                <img src="{chart_src}" alt="Depression Score Trend">
             </div>
             <p>The chart above shows depression score variation throughout the session.</p>
         </div>
@@ -266,21 +322,21 @@ def generate_session_report(session_id: str, output_path: Optional[str] = None)
                     <th>Percentage</th>
                 </tr>
             """)
-            
-            # Add depression level distribution
-            level_counts = summary.get('depression_level_distribution', {})
-            total = sum(level_counts.values())
-            for level, count in level_counts.items():
-                percentage = (count / total * 100) if total > 0 else 0
-                f.write(f"""
+
+        # Add depression level distribution
+        level_counts = summary.get('depression_level_distribution', {})
+        total = sum(level_counts.values())
+        for level, count in level_counts.items():
+            percentage = (count / total * 100) if total > 0 else 0
+            parts.append(f"""
                 <tr>
                     <td class="risk-{level.split()[0].lower()}">{level.upper()}</td>
                     <td>{count}</td>
                     <td>{percentage:.1f}%</td>
                 </tr>
                 """)
-            
-            f.write("""
+
+        parts.append("""
             </table>
         </div>
         
@@ -294,22 +350,21 @@ def generate_session_report(session_id: str, output_path: Optional[str] = None)
                     <th>Risk Level</th>
                 </tr>
             """)
-            
-            # Add sample transcripts (up to 10 samples)
-            samples = min(10, len(session_data))
-            sample_indices = np.linspace(0, len(session_data) - 1, samples, dtype=int)
-            
-            for idx in sample_indices:
-                row = session_data.iloc[idx]
-                transcript = row['transcript']
-                if len(transcript) > 100:
-                    transcript = transcript[:100] + "..."
-                    
-                score = row['depression_score']
-                level = row['depression_level']
-                timestamp = row['timestamp']
-                
-                f.write(f"""
+
+        # Add sample transcripts (up to 10 samples)
+        samples = min(10, len(session_data))
+        sample_indices = np.linspace(0, len(session_data) - 1, samples, dtype=int)
+
+        for idx in sample_indices:
+            transcript = tx_arr[idx]
+            if len(transcript) > 100:
+                transcript = transcript[:100] + "..."
+
+            score = sc_arr[idx]
+            level = lv_arr[idx]
+            timestamp = ts_arr[idx]
+
+            parts.append(f"""
                 <tr>
                     <td>{timestamp.split('T')[1][:8] if 'T' in timestamp else timestamp}</td>
                     <td>{transcript}</td>
@@ -317,19 +372,19 @@ def generate_session_report(session_id: str, output_path: Optional[str] = None)
                     <td class="risk-{level.split()[0].lower()}">{level.upper()}</td>
                 </tr>
                 """)
-            
-            f.write("""
+
+        parts.append("""
             </table>
         </div>
-        
+
         <div class="section">
             <h2>Key Metrics</h2>
             """)
-            
-            # Add key metrics
-            key_metrics = summary.get('key_metrics', {})
-            if key_metrics:
-                f.write("""
+
+        # Add key metrics
+        key_metrics = summary.get('key_metrics', {})
+        if key_metrics:
+            parts.append("""
                 <table>
                     <tr>
                         <th>Metric</th>
@@ -337,40 +392,32 @@ def generate_session_report(session_id: str, output_path: Optional[str] = None)
                         <th>Interpretation</th>
                     </tr>
                 """)
-                
-                metrics_info = [
-                    ("average_negative_sentiment", "Negative Sentiment", "Higher values indicate more negative emotional tone"),
-                    ("average_depression_keyword_ratio", "Depression Keywords", "Higher values indicate more depression-related vocabulary"),
-                    ("average_self_focus", "Self-Focus", "Higher values indicate increased focus on self in speech")
-                ]
-                
-                for key, name, interpretation in metrics_info:
-                    if key in key_metrics:
-                        value = key_metrics[key]
-                        f.write(f"""
+
+            metrics_info = [
+                ("average_negative_sentiment", "Negative Sentiment", "Higher values indicate more negative emotional tone"),
+                ("average_depression_keyword_ratio", "Depression Keywords", "Higher values indicate more depression-related vocabulary"),
+                ("average_self_focus", "Self-Focus", "Higher values indicate increased focus on self in speech")
+            ]
+
+            for key, name, interpretation in metrics_info:
+                if key in key_metrics:
+                    value = key_metrics[key]
+                    parts.append(f"""
                         <tr>
                             <td>{name}</td>
                             <td>{value:.3f}</td>
                             <td>{interpretation}</td>
                         </tr>
                         """)
-                
-                f.write("</table>")
-            
-            f.write("""
-        </div>
-        
-        <div class="section">
-            <h3>Disclaimer</h3>
-            <p>This analysis is for informational purposes only and is not a clinical diagnosis. 
-            Always consult with qualified healthcare professionals for mental health concerns.</p>
-            <p><small>Report generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</small></p>
-        </div>
-    </div>
-</body>
-</html>
-            """)
-        
+
+            parts.append("</table>")
+
+        parts.append(_REPORT_FOOTER.format(generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+        # Single write of the assembled report
+        with open(output_path, 'w') as f:
+            f.write("".join(parts))
+
         return output_path
     
     except Exception as e: